@@ -6,9 +6,15 @@ A simple python script to extract plan summary
 """
 
 import json
+import os
 import sys
-from pathlib import Path
+from html import escape
+from itertools import islice
 
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
 
 HEADER = {
     "html": """
@@ -42,167 +48,293 @@ FOOTER = {
     "markdown": "\n\n",
 }
 
+# Placeholder values shown in the Before/After columns.
+NULL_VALUE = "null"
+NEW_VALUE = "(New)"
+DELETED_VALUE = "(Deleted)"
+NONE_VALUE = "(none)"
 
-def gen_resource_changes(output_format, address, action, difflines):
-    """
-    Create a formatted resource block for the HTML output.
-    Args:
-        output_format (str): The format of the output (e.g., Markdown, HTML).
-        address (str): The resource address.
-        action (str): The action performed on the resource.
-        difflines (str): The lines of difference of resource properties to be displayed.
-    Returns:
-        str: A formatted string for the resource block.
-    """
-    if output_format == "html":
-        if difflines == "":
-            return f"""
+# %-style templates for a single property row, keyed by output format and
+# action. Each template takes (key, before_value, after_value).
+ROW_TEMPLATES = {
+    "html": {
+        "[CREATE]": '<tr class="create"><td><pre>%s</pre></td><td>%s</td><td>%s</td></tr>',
+        "[DELETE]": '<tr class="delete"><td><pre>%s</pre></td><td>%s</td><td>%s</td></tr>',
+        "[UPDATE]": '<tr class="update"><td><pre>%s</pre></td><td>%s</td><td>%s</td></tr>',
+        "[REPLACE]": '<tr class="replace"><td><pre>%s</pre></td><td>%s</td><td>%s</td></tr>',
+    },
+    "markdown": {
+        "[CREATE]": "| `%s` | %s | `%s` |",
+        "[DELETE]": "| `%s` | `%s` | %s |",
+        "[UPDATE]": "| `%s` | `%s` | `%s` |",
+        "[REPLACE]": "| `%s` | `%s` | `%s` |",
+    },
+}
+
+# str.format templates for a resource block, with the placeholders
+# {address}, {action} and {difflines}. They are plain strings rather than
+# Jinja2 templates so the action keeps running on a bare setup-python runner.
+# For HTML, the address and action are escaped in gen_resource_changes and
+# the property cells in iter_resource_blocks.
+HTML_BLOCK = """
 <div class="resource-block">
 <h3>Resource: {address}</h3>
 <p><strong>Actions:</strong> {action}</p>
 <div class="diff-section">
-<p>No property changes detected.</p>
+<table>
+<thead><tr><th>Property</th><th>Before</th><th>After</th></tr></thead>
+<tbody>
+{difflines}
+</tbody>
+</table>
 </div>
 </div>
 """
-        return f"""
+
+HTML_EMPTY_BLOCK = """
 <div class="resource-block">
 <h3>Resource: {address}</h3>
 <p><strong>Actions:</strong> {action}</p>
 <div class="diff-section">
-<table>
-<thead><tr><th>Property</th><th>Before</th><th>After</th></tr></thead>
-<tbody>
-{difflines}
-</tbody>
-</table>
+<p>No property changes detected.</p>
 </div>
 </div>
 """
-    if output_format == "markdown":
-        if difflines == "":
-            return (
-                f"### Resource {action}: `{address}`\n\n"
-                + "No property changes detected.\n"
-            )
-        return (
-            f"### Resource {action}: `{address}`\n\n"
-            + "| Property | Before | After |\n"
-            + "| -------- | ------ | ----- |\n"
-            + difflines
-        )
 
-    return ""
+MARKDOWN_BLOCK = (
+    "### Resource {action}: `{address}`\n\n"
+    + "| Property | Before | After |\n"
+    + "| -------- | ------ | ----- |\n"
+    + "{difflines}"
+)
+
+MARKDOWN_EMPTY_BLOCK = (
+    "### Resource {action}: `{address}`\n\n" + "No property changes detected.\n"
+)
+
+# Resource block templates keyed by output format, as (block, empty_block).
+BLOCK_TEMPLATES = {
+    "html": (HTML_BLOCK, HTML_EMPTY_BLOCK),
+    "markdown": (MARKDOWN_BLOCK, MARKDOWN_EMPTY_BLOCK),
+}
+
+
+def gen_resource_changes(output_format, address, action, difflines):
+    """
+    Create a formatted resource block for the HTML output.
+    Args:
+        output_format (str): The format of the output (e.g., Markdown, HTML).
+        address (str): The resource address.
+        action (str): The action performed on the resource.
+        difflines (str): The lines of difference of resource properties to be displayed.
+    Returns:
+        str: A formatted string for the resource block.
+    """
+    if output_format == "html":
+        address = escape(address, quote=False)
+        action = escape(action, quote=False)
+    block, empty_block = BLOCK_TEMPLATES[output_format]
+    tmpl = block if difflines else empty_block
+    return tmpl.format_map(
+        {"address": address, "action": action, "difflines": difflines}
+    )
 
 
-def gen_resource_property_changes(
-    output_format, action, key, before_value, after_value
-):
+def format_value(value):
     """
-    Create a formatted line for the diff table.
+    Format a property value for the diff table.
+    Strings are shown as is; every other value, including booleans,
+    numbers and nested objects, is serialized as compact JSON.
     Args:
-        output_format (str): The format of the diff line (e.g., Markdown, HTML).
-        action (str): The action type of change (CREATE, DELETE, UPDATE, REPLACE).
-        key (str): The property name.
-        before_value: The value before the change.
-        after_value: The value after the change.
+        value: The property value from the Terraform plan.
     Returns:
-        str: A formatted string for the diff table.
-    """
-    diff_formats = {
-        "html": {
-            "[CREATE]": f'<tr class="create"><td><pre>{key}</pre></td><td>(New)</td><td>{after_value}</td></tr>',
-            "[DELETE]": f'<tr class="delete"><td><pre>{key}</pre></td><td>{before_value}</td><td>(Deleted)</td></tr>',
-            "[UPDATE]": f'<tr class="update"><td><pre>{key}</pre></td><td>{before_value}</td><td>{after_value}</td></tr>',
-            "[REPLACE]": f'<tr class="replace"><td><pre>{key}</pre></td><td>{before_value}</td><td>{after_value}</td></tr>',
-        },
-        "markdown": {
-            "[CREATE]": f"| `{key}` | (New) | `{after_value}` |",
-            "[DELETE]": f"| `{key}` | `{before_value}` | (Deleted) |",
-            "[UPDATE]": f"| `{key}` | `{before_value}` | `{after_value}` |",
-            "[REPLACE]": f"| `{key}` | `{before_value}` | `{after_value}` |",
-        },
-    }
-    return diff_formats[output_format][action]
+        str: The value to be displayed in the diff table.
+    """
+    if value is None:
+        return NULL_VALUE
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
 
 
-def summarize_changes(tfplan_json_file, output_format="html"):
+def diff_create(before, after):  # pylint: disable=unused-argument
     """
-    Summarize changes in a Terraform plan JSON file.
+    Compute the property diffs of a resource to be created.
     Args:
-        tfplan_json_file (dict): The JSON content of the Terraform plan file.
+        before (dict): The resource properties before the change.
+        after (dict): The resource properties after the change.
     Returns:
-        str: A summary of the changes in Markdown format.
+        list: The (key, before_value, after_value) tuples of the properties.
     """
-    output = []
+    return [
+        (key, NEW_VALUE, format_value(value))
+        for key, value in after.items()
+    ]
+
 
-    for change in tfplan_json_file.get("resource_changes", []):
-        actions = change["change"]["actions"]
+def diff_delete(before, after):  # pylint: disable=unused-argument
+    """
+    Compute the property diffs of a resource to be deleted.
+    Args:
+        before (dict): The resource properties before the change.
+        after (dict): The resource properties after the change.
+    Returns:
+        list: The (key, before_value, after_value) tuples of the properties.
+    """
+    return [
+        (key, format_value(value), DELETED_VALUE)
+        for key, value in before.items()
+    ]
+
+
+def diff_update(before, after):
+    """
+    Compute the property diffs of a resource to be updated in place.
+    Args:
+        before (dict): The resource properties before the change.
+        after (dict): The resource properties after the change.
+    Returns:
+        list: The (key, before_value, after_value) tuples of the changed properties.
+    """
+    diffs = []
+    append = diffs.append
+    for key, after_value in after.items():
+        before_value = before.get(key, NEW_VALUE)
+        before_value = NULL_VALUE if before_value is None else before_value
+        after_value = NULL_VALUE if after_value is None else after_value
+        if before_value != after_value:
+            append((key, format_value(before_value), format_value(after_value)))
+    return diffs
+
+
+def diff_replace(before, after):
+    """
+    Compute the property diffs of a resource to be replaced.
+    Args:
+        before (dict): The resource properties before the change.
+        after (dict): The resource properties after the change.
+    Returns:
+        list: The (key, before_value, after_value) tuples of the changed properties.
+    """
+    diffs = []
+    append = diffs.append
+    for key, before_value in before.items():
+        after_value = after.get(key, NONE_VALUE)
+        before_value = NULL_VALUE if before_value is None else before_value
+        after_value = NULL_VALUE if after_value is None else after_value
+        if before_value != after_value:
+            append((key, format_value(before_value), format_value(after_value)))
+    for key, after_value in after.items():
+        if key in before:
+            continue
+        append((key, NONE_VALUE, format_value(after_value)))
+    return diffs
+
+
+# Maps the Terraform change actions to the action label and diff function.
+ACTIONS = {
+    ("create",): ("[CREATE]", diff_create),
+    ("delete",): ("[DELETE]", diff_delete),
+    ("update",): ("[UPDATE]", diff_update),
+    ("delete", "create"): ("[REPLACE]", diff_replace),
+}
+
+
+def iter_resource_changes(f):
+    """
+    Iterate over the resource changes of a Terraform plan JSON file.
+    Streams the changes one by one with ijson (3.1 or later) when it is
+    installed, which the action does when its stream_plan input is true,
+    otherwise falls back to loading the whole document with json.
+    ijson's C backend rejects integers wider than 64 bits, so such plans
+    are re-read with json, skipping the changes already yielded.
+    Args:
+        f: The Terraform plan JSON file opened in binary mode.
+    Yields:
+        dict: The resource change objects.
+    """
+    count = 0
+    if ijson is not None:
+        try:
+            for change in ijson.items(f, "resource_changes.item", use_float=True):
+                yield change
+                count += 1
+            return
+        except ijson.JSONError:
+            f.seek(0)
+    yield from islice(json.load(f).get("resource_changes", []), count, None)
+
+
+def iter_resource_blocks(changes_iter, output_format):
+    """
+    Format the resource changes of a Terraform plan into resource blocks.
+    Args:
+        changes_iter (iterable): The resource changes of the Terraform plan.
+        output_format (str): The format of the output (e.g., Markdown, HTML).
+    Yields:
+        str: The resource block of each resource change, in plan order.
+    """
+    row_templates = ROW_TEMPLATES[output_format]
+    escape_cells = output_format == "html"
+
+    for change in changes_iter:
+        resource_change = change["change"]
+        actions = resource_change["actions"]
         address = change["address"]
-        before = change["change"].get("before", {}) or {}
-        after = change["change"].get("after", {}) or {}
-
-        diffs = []
-        action = ""
-        if actions == ["create"]:
-            action = "[CREATE]"
-            for key, value in after.items():
-                value = "null" if value is None else value
-                diffs.append(
-                    gen_resource_property_changes(
-                        output_format, action, key, "(New)", value
-                    )
-                )
-        elif actions == ["delete"]:
-            action = "[DELETE]"
-            for key, value in before.items():
-                value = "null" if value is None else value
-                diffs.append(
-                    gen_resource_property_changes(
-                        output_format, action, key, value, "(Deleted)"
-                    )
-                )
-        elif actions == ["update"]:
-            action = "[UPDATE]"
-            for key in after:
-                before_value = before.get(key, "(New)")
-                after_value = after.get(key, "(Delete)")
-                before_value = "null" if before_value is None else before_value
-                after_value = "null" if after_value is None else after_value
-                if before_value != after_value:
-                    diffs.append(
-                        gen_resource_property_changes(
-                            output_format, action, key, before_value, after_value
-                        )
-                    )
-        elif actions == ["delete", "create"]:
-            action = "[REPLACE]"
-            all_keys = set(before.keys()).union(set(after.keys()))
-            for key in sorted(all_keys):
-                before_value = before.get(key, "(none)")
-                after_value = after.get(key, "(none)")
-                before_value = "null" if before_value is None else before_value
-                after_value = "null" if after_value is None else after_value
-                if before_value != after_value:
-                    diffs.append(
-                        gen_resource_property_changes(
-                            output_format, action, key, before_value, after_value
-                        )
-                    )
+        before = resource_change.get("before") or {}
+        after = resource_change.get("after") or {}
+
+        action, diff_fn = ACTIONS.get(tuple(actions), ("", None))
+        diffs = diff_fn(before, after) if diff_fn else []
 
         if diffs:
-            output.append(
-                gen_resource_changes(output_format, address, action, "\n".join(diffs))
+            tmpl = row_templates[action]
+            if escape_cells:
+                diffs = [
+                    tuple(escape(str(cell), quote=False) for cell in row)
+                    for row in diffs
+                ]
+            yield gen_resource_changes(
+                output_format, address, action, "\n".join([tmpl % row for row in diffs])
             )
         else:
-            output.append(
-                gen_resource_changes(output_format, address, "NoChanges", "")
-            )
+            yield gen_resource_changes(output_format, address, "NoChanges", "")
+
+
+def iter_summary(changes_iter, output_format="html"):
+    """
+    Summarize changes in a Terraform plan JSON file, chunk by chunk.
+    Args:
+        changes_iter (iterable): The resource changes of the Terraform plan.
+        output_format (str): The format of the output (e.g., Markdown, HTML).
+    Yields:
+        str: The header, each resource block and the footer of the summary.
+    """
+    yield HEADER[output_format]
+    separator = ""
 
-    if not output:
-        output.append("No changes detected in the Terraform plan.")
+    for block in iter_resource_blocks(changes_iter, output_format):
+        yield separator + block
+        separator = "\n\n"
 
-    return HEADER[output_format] + "\n\n".join(output) + FOOTER[output_format]
+    if not separator:
+        yield "No changes detected in the Terraform plan."
+
+    yield FOOTER[output_format]
+
+
+def summarize_changes(tfplan_json_file, output_format="html"):
+    """
+    Summarize changes in a Terraform plan JSON file.
+    Args:
+        tfplan_json_file (dict): The JSON content of the Terraform plan file.
+        output_format (str): The format of the output (e.g., Markdown, HTML).
+    Returns:
+        str: A summary of the changes in the requested format.
+    """
+    return "".join(
+        iter_summary(tfplan_json_file.get("resource_changes", []), output_format)
+    )
 
 
 def main():
@@ -212,12 +344,18 @@ def main():
     input_file = sys.argv[1]
     output_file = sys.argv[2]
 
-    with open(input_file, "r", encoding="utf-8") as f:
-        tfplan = json.load(f)
-
     output_format = "html" if output_file.endswith(".html") else "markdown"
-    output = summarize_changes(tfplan, output_format)
-    Path(output_file).write_text(output, encoding="utf-8")
+    # Write to a temporary file first so a plan that fails to parse does
+    # not leave a partial summary behind.
+    tmp_file = output_file + ".tmp"
+    try:
+        with open(input_file, "rb") as f, open(tmp_file, "w", encoding="utf-8") as out:
+            out.writelines(iter_summary(iter_resource_changes(f), output_format))
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
     print(f"✅ Terraform plan {output_format} file written to {output_file}")
 
 